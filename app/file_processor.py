@@ -3,9 +3,10 @@ import logging
 import base64
 import pdfplumber
 import time
+import json
 
 from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
-from utils.file_utils import write_output_file
+from utils.file_utils import write_output_file, parse_json_output
 from utils.image_utils import extract_and_combine_images
 from utils.conversion_utils import extract_and_combine_images_from_docx,convert_doc_to_docx
 
@@ -41,6 +42,59 @@ class FileProcessor:
             return None
 
 
+    def load_text(self, file_path):
+        """
+        Extracts the text layer of a PDF or DOCX file. Other file types (images) have no
+        text layer and return an empty string.
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension == ".pdf":
+            loader = PyPDFLoader(file_path)
+        elif file_extension == ".docx":
+            loader = Docx2txtLoader(file_path)
+        else:
+            return ""
+        return "".join(page.page_content for page in loader.load())
+
+
+    def build_image_payload(self, file_path):
+        """
+        Builds the base64 image sent to GPT-4o: the combined embedded images of a PDF or
+        DOCX file, or the file itself for image files.
+
+        :return: Base64 string, or None if no image could be produced.
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension == ".pdf":
+            image_path = extract_and_combine_images(file_path)
+        elif file_extension == ".docx":
+            image_path = extract_and_combine_images_from_docx(file_path)
+        else:
+            image_path = file_path
+
+        if not image_path or not os.path.exists(image_path):
+            return None
+        return self.encode_image_to_base64(image_path)
+
+
+    def convert_doc(self, doc_file_path):
+        """
+        Converts a .doc file to .docx next to it and deletes the original .doc.
+
+        :return: Path of the .docx file, or None if the conversion failed.
+        """
+        docx_file_path = convert_doc_to_docx(doc_file_path)
+        if not docx_file_path or not os.path.exists(docx_file_path):
+            return None
+
+        try:
+            os.remove(doc_file_path)
+            logging.info(f"Deleted original DOC file: {doc_file_path}")
+        except Exception as delete_error:
+            logging.warning(f"Failed to delete DOC file {doc_file_path}: {delete_error}")
+        return docx_file_path
+
+
     def process_pdf_files(self, pdf_file):
         """
         Processes a PDF file: extracts text using PyPDFLoader, or processes images if text is empty.
@@ -57,8 +111,7 @@ class FileProcessor:
                 return {"error": f"File not found: {pdf_file}"}
 
             try:
-                pdf_loader = PyPDFLoader(pdf_file_path)
-                pdf_text = "".join(page.page_content for page in pdf_loader.load())
+                pdf_text = self.load_text(pdf_file_path)
             except Exception as e:
                 logging.error(f"Error reading PDF file {pdf_file}: {str(e)}")
                 return {"error": f"Failed to read PDF file: {pdf_file}"}
@@ -76,12 +129,11 @@ class FileProcessor:
                 logging.warning(f"Empty text extracted from {pdf_file}, processing images instead.")
                 
                 try:
-                    combined_image_path = extract_and_combine_images(pdf_file_path)
-                    if not combined_image_path or not os.path.exists(combined_image_path):
+                    base64_image = self.build_image_payload(pdf_file_path)
+                    if not base64_image:
                         logging.error(f"Failed to extract images from {pdf_file}")
                         return {"error": f"Failed to extract images from {pdf_file}"}
 
-                    base64_image = self.encode_image_to_base64(combined_image_path)
                     resume_info = self.client.call_gpt4o(base64_image)
 
                     if not resume_info.strip():
@@ -124,7 +176,7 @@ class FileProcessor:
 
             # Encode image to Base64
             try:
-                base64_image = self.encode_image_to_base64(image_file_path)
+                base64_image = self.build_image_payload(image_file_path)
                 if not base64_image:
                     logging.error(f"Failed to encode image: {image_file_path}")
                     return None
@@ -166,8 +218,7 @@ class FileProcessor:
                 return {"error": f"File not found: {docx_file}"}
 
             try:
-                docx_loader = Docx2txtLoader(docx_file_path)
-                docx_text = "".join(page.page_content for page in docx_loader.load())
+                docx_text = self.load_text(docx_file_path)
             except Exception as e:
                 logging.error(f"Error reading DOCX file {docx_file}: {str(e)}")
                 return {"error": f"Failed to read DOCX file: {docx_file}"}
@@ -185,12 +236,11 @@ class FileProcessor:
                 logging.warning(f"Empty text extracted from {docx_file}, processing images instead.")
 
                 try:
-                    combined_image_path = extract_and_combine_images_from_docx(docx_file_path)
-                    if not combined_image_path or not os.path.exists(combined_image_path):
+                    base64_image = self.build_image_payload(docx_file_path)
+                    if not base64_image:
                         logging.error(f"Failed to extract images from {docx_file}")
                         return {"error": f"Failed to extract images from {docx_file}"}
 
-                    base64_image = self.encode_image_to_base64(combined_image_path)
                     resume_info = self.client.call_gpt4o(base64_image)
 
                     if not resume_info.strip():
@@ -233,33 +283,24 @@ class FileProcessor:
             return {"error": f"File not found: {doc_file_path}"}
 
         try:
-            # Step 1: Convert .doc to .docx
-            docx_file_path = convert_doc_to_docx(doc_file_path)
-            if not docx_file_path or not os.path.exists(docx_file_path):
+            # Steps 1-2: Convert .doc to .docx and delete the original .doc
+            docx_file_path = self.convert_doc(doc_file_path)
+            if not docx_file_path:
                 logging.error(f"Failed to convert {doc_file} to .docx. Skipping.")
                 return {"error": f"Conversion failed for {doc_file}"}
 
-            # Step 2: Delete the original .doc file after successful conversion
-            try:
-                os.remove(doc_file_path)
-                logging.info(f"Deleted original DOC file: {doc_file_path}")
-            except Exception as delete_error:
-                logging.warning(f"Failed to delete DOC file {doc_file_path}: {delete_error}")
-
             extracted_text = ""  
 
             try:
                 # Step 3: Extract text from .docx
-                docx_loader = Docx2txtLoader(docx_file_path)
-                extracted_text = "".join(page.page_content for page in docx_loader.load()).strip()
+                extracted_text = self.load_text(docx_file_path).strip()
 
                 # Step 4: If no text, extract from images
                 if not extracted_text:
                     logging.warning(f"No text extracted from {doc_file}. Trying image extraction.")
-                    combined_image_path = extract_and_combine_images_from_docx(docx_file_path)
+                    base64_image = self.build_image_payload(docx_file_path)
 
-                    if combined_image_path and os.path.exists(combined_image_path):
-                        base64_image = self.encode_image_to_base64(combined_image_path)
+                    if base64_image:
                         extracted_text = self.client.call_gpt4o(base64_image)  # Directly save output
 
                         if not extracted_text:
@@ -287,3 +328,73 @@ class FileProcessor:
             logging.error(f"Critical error processing DOC {doc_file}: {str(e)}")
             return {"error": f"Critical error processing {doc_file}: {str(e)}"}
 
+
+    def stream_file(self, file_name):
+        """
+        Processes a file like the process_*_files methods, but as a generator of
+        (event, payload) tuples so progress can be pushed to the client while the
+        model is still writing:
+
+        - converted:   .doc was converted to .docx
+        - parsed:      text extracted from the document
+        - ocr:         no text found, images combined for the vision model
+        - llm_started: the completion request was sent
+        - output:      an incremental chunk of the model response
+        - result:      the final, validated JSON (also written to the output directory)
+        - error:       processing stopped; payload carries the error message
+
+        :param file_name: Name of the file (in the input directory) to process.
+        """
+        start_time = time.time()
+        file_path = os.path.join(self.input_directory, file_name)
+        file_extension = os.path.splitext(file_name)[1].lower()
+
+        if not os.path.exists(file_path):
+            logging.error(f"File not found: {file_path}")
+            yield "error", {"error": f"File not found: {file_name}"}
+            return
+
+        try:
+            if file_extension == ".doc":
+                file_path = self.convert_doc(file_path)
+                if not file_path:
+                    logging.error(f"Failed to convert {file_name} to .docx.")
+                    yield "error", {"error": f"Conversion failed for {file_name}"}
+                    return
+                yield "converted", {"file": os.path.basename(file_path)}
+
+            text = self.load_text(file_path)
+
+            if text.strip():
+                yield "parsed", {"characters": len(text)}
+                stream = self.client.stream_resume_info(text)
+            else:
+                base64_image = self.build_image_payload(file_path)
+                if not base64_image:
+                    logging.error(f"Failed to extract images from {file_name}")
+                    yield "error", {"error": f"Failed to extract images from {file_name}"}
+                    return
+                yield "ocr", {}
+                stream = self.client.stream_gpt4o(base64_image)
+
+            yield "llm_started", {}
+            chunks = []
+            for delta in stream:
+                chunks.append(delta)
+                yield "output", {"delta": delta}
+            resume_info = "".join(chunks)
+
+            try:
+                extracted_info = parse_json_output(resume_info)
+            except json.JSONDecodeError as e:
+                logging.error(f"Invalid JSON returned for {file_name}: {str(e)}")
+                yield "error", {"error": f"Model returned invalid JSON for {file_name}"}
+                return
+
+            write_output_file(self.output_directory, file_name, resume_info)
+            logging.info(f"Streamed {file_name} in {time.time() - start_time:.2f} seconds.")
+            yield "result", {"extracted_info": extracted_info}
+
+        except Exception as e:
+            logging.error(f"Unexpected error streaming {file_name}: {str(e)}")
+            yield "error", {"error": f"Unexpected error while processing {file_name}"}
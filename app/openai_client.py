@@ -2,6 +2,7 @@ import openai
 import requests
 import logging
 import time
+import threading
 from constants import OPENAI_API_KEY, SYSTEM_PROMPT, USER_PROMPT, JSON_TEMPLATE
 
 
@@ -12,10 +13,23 @@ class OpenAIClient:
             raise ValueError("OpenAI API key is not set.")
         self.api_key = api_key
         self.client = openai.Client(api_key=self.api_key)
+        # Tokens spent by the current thread, read by the scheduler for per-tenant quotas
+        self._usage = threading.local()
         
         logging.info(f"Initialized OpenAIClient in {time.time() - start_time:.2f} seconds.")
 
 
+    def _record_usage(self, total_tokens):
+        self._usage.total_tokens = getattr(self._usage, "total_tokens", 0) + (total_tokens or 0)
+
+
+    def pop_token_usage(self):
+        """Return the tokens used by the calling thread since the last call, and reset the counter."""
+        total_tokens = getattr(self._usage, "total_tokens", 0)
+        self._usage.total_tokens = 0
+        return total_tokens
+
+
     def extract_resume_info(self, resume_text):
         start_time = time.time()
         url = "https://api.openai.com/v1/chat/completions"
@@ -30,7 +44,10 @@ class OpenAIClient:
 
         response = requests.post(url, headers=headers, json=data, verify=False)
         logging.info(f"Extracted resume info in {time.time() - start_time:.2f} seconds.")
-        return response.json()['choices'][0]['message']['content'] if response.status_code == 200 else None
+        if response.status_code != 200:
+            return None
+        self._record_usage(response.json().get('usage', {}).get('total_tokens'))
+        return response.json()['choices'][0]['message']['content']
 
 
     def call_gpt4o(self, base64_image):
@@ -47,4 +64,50 @@ class OpenAIClient:
             max_tokens=4096
         )
         logging.info(f"Called GPT-4o in {time.time() - start_time:.2f} seconds.")
+        if response.usage:
+            self._record_usage(response.usage.total_tokens)
         return response.choices[0].message.content
+
+
+    def stream_resume_info(self, resume_text):
+        """Stream the text-based extraction, yielding content deltas as they arrive."""
+        start_time = time.time()
+        stream = self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": f"{USER_PROMPT}\n{JSON_TEMPLATE}\n{resume_text}\nPlease respond in valid JSON format."}
+            ],
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        yield from self._iter_stream(stream)
+        logging.info(f"Streamed resume info in {time.time() - start_time:.2f} seconds.")
+
+
+    def stream_gpt4o(self, base64_image):
+        """Stream the image-based extraction, yielding content deltas as they arrive."""
+        start_time = time.time()
+        stream = self.client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": [
+                    {"type": "text", "text": f"{USER_PROMPT}\n{JSON_TEMPLATE}\nPlease respond in valid JSON format."},
+                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
+                ]}
+            ],
+            max_tokens=4096,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        yield from self._iter_stream(stream)
+        logging.info(f"Streamed GPT-4o in {time.time() - start_time:.2f} seconds.")
+
+
+    def _iter_stream(self, stream):
+        for chunk in stream:
+            if chunk.usage:
+                self._record_usage(chunk.usage.total_tokens)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
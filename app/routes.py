@@ -1,40 +1,188 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 import os
+import json
+import logging
+import queue
+import shutil
+import uuid
+from concurrent.futures import TimeoutError
 from app.file_processor import FileProcessor
 from app.openai_client import OpenAIClient
-from config.settings import OPENAI_API_KEY, INPUT_DIR, OUTPUT_DIR
+from app.scheduler import TenantScheduler, QueueFullError, INTERACTIVE, BULK
+from config.settings import (
+    OPENAI_API_KEY, INPUT_DIR, OUTPUT_DIR, TENANT_API_KEYS, TENANT_WEIGHTS, TENANT_QUOTAS,
+    TENANT_REQUESTS_PER_MINUTE, TENANT_TOKENS_PER_MINUTE, TENANT_MAX_QUEUE_DEPTH,
+    SCHEDULER_WORKERS, SCHEDULER_INTERACTIVE_WORKERS, SCHEDULER_REQUEST_TIMEOUT
+)
 
 routes = Blueprint("routes", __name__)
 
 # Initialize OpenAI client
 client = OpenAIClient(OPENAI_API_KEY)
 
-# Initialize FileProcessor
-file_processor = FileProcessor(INPUT_DIR, OUTPUT_DIR, client, "Your System Prompt", "Your User Prompt", "Your JSON Template")
+
+def upload_processor(upload_dir):
+    """
+    Create the FileProcessor for one upload. Each request gets its own input directory so
+    concurrent uploads with the same file name never overwrite (or delete) each other,
+    while output files keep the original file name.
+    """
+    return FileProcessor(upload_dir, OUTPUT_DIR, client, "Your System Prompt", "Your User Prompt", "Your JSON Template")
+
+
+# Initialize the scheduler that runs FileProcessor jobs with per-tenant fair queuing
+scheduler = TenantScheduler(
+    workers=SCHEDULER_WORKERS,
+    interactive_workers=SCHEDULER_INTERACTIVE_WORKERS,
+    weights=TENANT_WEIGHTS,
+    requests_per_minute=TENANT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=TENANT_TOKENS_PER_MINUTE,
+    quotas=TENANT_QUOTAS,
+    max_queue_depth=TENANT_MAX_QUEUE_DEPTH,
+    token_usage=client.pop_token_usage
+)
+
+SUPPORTED_EXTENSIONS = [".pdf", ".png", ".jpg", ".jpeg", ".docx", ".doc"]
+
+
+def format_sse(event, payload):
+    """Format a single Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def wants_stream():
+    """Streaming is requested with ?stream=true or an Accept: text/event-stream header."""
+    if request.args.get("stream", "").lower() in ("1", "true"):
+        return True
+    return "text/event-stream" in request.headers.get("Accept", "")
+
+
+def request_tenant():
+    """Resolve the tenant from the X-API-Key header; unknown or missing keys share the default tenant."""
+    return TENANT_API_KEYS.get(request.headers.get("X-API-Key", ""), "default")
+
+
+def request_priority():
+    """Requests are bulk unless the client opts in with X-Priority: interactive."""
+    return INTERACTIVE if request.headers.get("X-Priority", "").lower() == INTERACTIVE else BULK
+
+
+def discard_upload(upload_dir):
+    """Remove the input directory of an upload that will never be processed."""
+    try:
+        shutil.rmtree(upload_dir)
+    except OSError as e:
+        logging.warning(f"Failed to remove rejected upload {upload_dir}: {e}")
+
+
+def process_by_extension(file_processor, filename, file_extension):
+    if file_extension in [".pdf"]:
+        return file_processor.process_pdf_files(filename)
+    elif file_extension in [".png", ".jpg", ".jpeg"]:
+        return file_processor.process_image_files(filename)
+    elif file_extension in [".docx"]:
+        return file_processor.process_docx_files(filename)
+    elif file_extension in [".doc"]:
+        return file_processor.process_doc_files(filename)
+
 
 @routes.route('/process_file', methods=['POST'])
 def process_file():
     """
     Handles both PDF and image files, extracts relevant information, and returns the result.
+    When streaming is requested, progress and model output are sent as Server-Sent Events
+    and the validated JSON arrives in the final "result" event.
+
+    The two modes return different shapes on purpose: the non-streaming response keeps its
+    original {"extracted_info": {"message": ...}} contract for existing clients and the output
+    is read from the output directory, while a streaming client has already received the raw
+    model text as it was written, so the final event carries the parsed JSON instead. Both
+    modes share the same text extraction, image fallback and .doc conversion in FileProcessor.
+
+    Headers:
+    - X-API-Key: selects the tenant (see TENANT_API_KEYS); unknown keys share "default".
+    - X-Priority: "interactive" for a user waiting on the result (e.g. the recruiter UI).
+      Anything else, including no header, is scheduled as bulk, so existing batch clients
+      never compete with interactive users for the reserved workers.
+
+    Processing runs on the tenant scheduler; a tenant with a full queue gets a 429, and a
+    request that does not finish within SCHEDULER_REQUEST_TIMEOUT (or, when streaming, does
+    not start within it) gets a 503.
     """
     file = request.files.get('file')
     if not file:
         return jsonify({"error": "No file uploaded"}), 400
 
-    file_path = os.path.join(INPUT_DIR, file.filename)
-    file.save(file_path)
-
     file_extension = os.path.splitext(file.filename)[1].lower()
-
-    if file_extension in [".pdf"]:
-        extracted_info = file_processor.process_pdf_files(file.filename)
-    elif file_extension in [".png", ".jpg", ".jpeg"]:
-        extracted_info = file_processor.process_image_files(file.filename)
-    elif file_extension in [".docx"]:
-        extracted_info = file_processor.process_docx_files(file.filename)
-    elif file_extension in [".doc"]:
-        extracted_info = file_processor.process_doc_files(file.filename)
-    else:
+    if file_extension not in SUPPORTED_EXTENSIONS:
         return jsonify({"error": "Unsupported file format"}), 400
 
+    filename = os.path.basename(file.filename)
+    upload_dir = os.path.join(INPUT_DIR, uuid.uuid4().hex)
+    os.makedirs(upload_dir)
+    file.save(os.path.join(upload_dir, filename))
+    file_processor = upload_processor(upload_dir)
+    tenant = request_tenant()
+    priority = request_priority()
+
+    if wants_stream():
+        events = queue.Queue()
+
+        def run():
+            events.put(("started", {}))
+            for item in file_processor.stream_file(filename):
+                events.put(item)
+
+        try:
+            future = scheduler.submit(tenant, priority, run)
+        except QueueFullError as e:
+            discard_upload(upload_dir)
+            return jsonify({"error": str(e)}), 429
+        future.add_done_callback(lambda _: events.put(None))
+
+        def generate():
+            yield format_sse("uploaded", {"file": filename})
+            yield format_sse("queued", {"tenant": tenant, "priority": priority})
+            try:
+                first = events.get(timeout=SCHEDULER_REQUEST_TIMEOUT)
+            except queue.Empty:
+                if future.cancel():
+                    discard_upload(upload_dir)
+                    yield format_sse("error", {"error": f"Timed out waiting in queue for {filename}"})
+                    return
+                # The job started just as the wait ran out; keep streaming its events
+                first = events.get()
+            if first is None:
+                events.put(None)
+            else:
+                yield format_sse(*first)
+            for event, payload in iter(events.get, None):
+                yield format_sse(event, payload)
+            if future.exception():
+                yield format_sse("error", {"error": f"Unexpected error while processing {filename}"})
+
+        return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    try:
+        future = scheduler.submit(tenant, priority, process_by_extension, file_processor, filename, file_extension)
+    except QueueFullError as e:
+        discard_upload(upload_dir)
+        return jsonify({"error": str(e)}), 429
+    try:
+        extracted_info = future.result(timeout=SCHEDULER_REQUEST_TIMEOUT)
+    except TimeoutError:
+        if future.cancel():
+            discard_upload(upload_dir)
+            return jsonify({"error": f"Timed out waiting in queue for {filename}"}), 503
+        return jsonify({"error": f"Timed out processing {filename}; the result will still be written to the output directory"}), 503
+
     return jsonify({"extracted_info": extracted_info})
+
+
+@routes.route('/metrics/tenants', methods=['GET'])
+def tenant_metrics():
+    """
+    Returns per-tenant queue depth, wait times and quota usage of the scheduler.
+    """
+    return jsonify(scheduler.metrics())
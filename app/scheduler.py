@@ -0,0 +1,286 @@
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BULK)
+
+# Quotas are enforced over a sliding window of this many seconds
+QUOTA_WINDOW = 60.0
+# Number of recent wait times kept per tenant and priority for the metrics
+WAIT_SAMPLES = 1000
+
+
+class QueueFullError(Exception):
+    """Raised when a tenant already has the maximum number of requests waiting."""
+
+
+class _Job:
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class _Tenant:
+
+    def __init__(self, name, weight, requests_per_minute, tokens_per_minute):
+        self.name = name
+        self.weight = weight
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.queues = {priority: deque() for priority in PRIORITIES}
+        # Stride-scheduling pass per priority: the tenant with the lowest pass runs next
+        self.passes = {priority: 0.0 for priority in PRIORITIES}
+        self.waits = {priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITIES}
+        self.request_times = deque()
+        self.token_usage = deque()
+        self.tokens_in_window = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+
+    def expire(self, now):
+        while self.request_times and now - self.request_times[0] >= QUOTA_WINDOW:
+            self.request_times.popleft()
+        while self.token_usage and now - self.token_usage[0][0] >= QUOTA_WINDOW:
+            self.tokens_in_window -= self.token_usage.popleft()[1]
+
+
+    def ready_at(self, now):
+        """Return the earliest time the tenant may start another request under its quotas."""
+        self.expire(now)
+        ready = now
+
+        if self.requests_per_minute and len(self.request_times) >= self.requests_per_minute:
+            ready = max(ready, self.request_times[-self.requests_per_minute] + QUOTA_WINDOW)
+
+        if self.tokens_per_minute and self.tokens_in_window >= self.tokens_per_minute:
+            excess = self.tokens_in_window - self.tokens_per_minute
+            freed = 0
+            for used_at, tokens in self.token_usage:
+                freed += tokens
+                if freed > excess:
+                    ready = max(ready, used_at + QUOTA_WINDOW)
+                    break
+
+        return ready
+
+
+def _check_quota(description, value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{description} must be a non-negative integer, got {value!r}")
+
+
+def _summarize_waits(waits):
+    if not waits:
+        return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(waits)
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 3),
+        "p50": round(ordered[int(0.50 * (len(ordered) - 1))], 3),
+        "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class TenantScheduler:
+    """
+    Runs processing jobs on a fixed pool of worker threads with per-tenant queues.
+
+    - Interactive requests always go before bulk ones, and a few workers only ever
+      take interactive requests so a backfill cannot occupy the whole pool.
+    - Within a priority class, tenants share the workers in proportion to their
+      weight (stride scheduling, a form of weighted fair queuing).
+    - A tenant over its requests- or tokens-per-minute quota is held back until
+      the sliding window frees up; its requests stay queued.
+    """
+
+    def __init__(self, workers=4, interactive_workers=1, weights=None, requests_per_minute=0,
+                 tokens_per_minute=0, quotas=None, max_queue_depth=20, token_usage=None):
+        """
+        :param workers: Number of workers serving both priority classes.
+        :param interactive_workers: Number of extra workers serving interactive requests only.
+        :param weights: Dict of tenant name -> weight (default 1).
+        :param requests_per_minute: Default per-tenant request quota, 0 for unlimited.
+        :param tokens_per_minute: Default per-tenant token quota, 0 for unlimited.
+        :param quotas: Dict of tenant name -> {"requests_per_minute": ..., "tokens_per_minute": ...} overrides.
+        :param max_queue_depth: Maximum number of waiting requests per tenant.
+        :param token_usage: Callable returning (and resetting) the tokens used by the calling thread.
+        :raises ValueError: If a tenant weight is not a positive number or a quota is not a non-negative integer.
+        """
+        for name, weight in (weights or {}).items():
+            if not isinstance(weight, (int, float)) or weight <= 0:
+                raise ValueError(f"Weight for tenant {name} must be a positive number, got {weight!r}")
+
+        _check_quota("Default requests_per_minute", requests_per_minute)
+        _check_quota("Default tokens_per_minute", tokens_per_minute)
+        for name, quota in (quotas or {}).items():
+            if not isinstance(quota, dict):
+                raise ValueError(f"Quotas for tenant {name} must be a mapping, got {quota!r}")
+            for key in ("requests_per_minute", "tokens_per_minute"):
+                if key in quota:
+                    _check_quota(f"{key} for tenant {name}", quota[key])
+
+        self.weights = weights or {}
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.quotas = quotas or {}
+        self.max_queue_depth = max_queue_depth
+        self.token_usage = token_usage
+
+        self._condition = threading.Condition()
+        self._tenants = {}
+        self._virtual_time = {priority: 0.0 for priority in PRIORITIES}
+
+        for index in range(workers):
+            threading.Thread(target=self._worker, args=(PRIORITIES,), name=f"scheduler-{index}", daemon=True).start()
+        for index in range(interactive_workers):
+            threading.Thread(target=self._worker, args=((INTERACTIVE,),), name=f"scheduler-interactive-{index}", daemon=True).start()
+
+        logging.info(f"Started scheduler with {workers} shared and {interactive_workers} interactive workers.")
+
+
+    def _tenant(self, name):
+        if name not in self._tenants:
+            quota = self.quotas.get(name, {})
+            self._tenants[name] = _Tenant(
+                name,
+                float(self.weights.get(name, 1)),
+                quota.get("requests_per_minute", self.requests_per_minute),
+                quota.get("tokens_per_minute", self.tokens_per_minute),
+            )
+        return self._tenants[name]
+
+
+    def submit(self, tenant, priority, func, *args, **kwargs):
+        """
+        Queue func(*args, **kwargs) for a tenant and return a Future with its result.
+
+        :raises QueueFullError: If the tenant already has max_queue_depth requests waiting.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        with self._condition:
+            state = self._tenant(tenant)
+            if sum(len(queue) for queue in state.queues.values()) >= self.max_queue_depth:
+                state.rejected += 1
+                raise QueueFullError(f"Too many queued requests for tenant {tenant}")
+
+            queue = state.queues[priority]
+            if not queue:
+                # A tenant coming back from idle must not use the time it was idle as credit
+                state.passes[priority] = max(state.passes[priority], self._virtual_time[priority])
+
+            job = _Job(func, args, kwargs)
+            queue.append(job)
+            self._condition.notify_all()
+
+        return job.future
+
+
+    def _next_job(self, priorities, now):
+        """Pop the next runnable job, or return the time a quota-blocked tenant frees up."""
+        retry_at = None
+
+        for priority in priorities:
+            best = None
+            for state in self._tenants.values():
+                # Requests whose caller gave up waiting are dropped without using quota
+                while state.queues[priority] and state.queues[priority][0].future.cancelled():
+                    state.queues[priority].popleft()
+                if not state.queues[priority]:
+                    continue
+                try:
+                    ready = state.ready_at(now)
+                except Exception as e:
+                    # A broken tenant must not stop scheduling for everyone else
+                    logging.error(f"Skipping tenant {state.name}, quota check failed: {str(e)}")
+                    continue
+                if ready > now:
+                    retry_at = ready if retry_at is None else min(retry_at, ready)
+                    continue
+                if best is None or state.passes[priority] < best.passes[priority]:
+                    best = state
+
+            if best is not None:
+                self._virtual_time[priority] = max(self._virtual_time[priority], best.passes[priority])
+                best.passes[priority] += 1.0 / best.weight
+                best.request_times.append(now)
+                return best, priority, best.queues[priority].popleft(), None
+
+        return None, None, None, retry_at
+
+
+    def _worker(self, priorities):
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    try:
+                        state, priority, job, retry_at = self._next_job(priorities, now)
+                    except Exception as e:
+                        # Never let a scheduling bug take the worker down; queued futures would hang forever
+                        logging.critical(f"Scheduler failed to pick the next job: {str(e)}", exc_info=True)
+                        self._condition.wait(1.0)
+                        continue
+                    if job is not None:
+                        break
+                    self._condition.wait(None if retry_at is None else max(retry_at - now, 0.01))
+                state.running += 1
+                state.waits[priority].append(now - job.enqueued_at)
+
+            tokens = 0
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    if self.token_usage:
+                        self.token_usage()
+                    try:
+                        job.future.set_result(job.func(*job.args, **job.kwargs))
+                    except Exception as e:
+                        logging.error(f"Scheduled job for tenant {state.name} failed: {str(e)}")
+                        job.future.set_exception(e)
+                    if self.token_usage:
+                        tokens = self.token_usage()
+            finally:
+                with self._condition:
+                    state.running -= 1
+                    state.completed += 1
+                    if tokens:
+                        state.token_usage.append((time.monotonic(), tokens))
+                        state.tokens_in_window += tokens
+
+
+    def metrics(self):
+        """Return per-tenant queue depth, wait times and quota usage."""
+        now = time.monotonic()
+        with self._condition:
+            metrics = {}
+            for name, state in self._tenants.items():
+                state.expire(now)
+                metrics[name] = {
+                    "weight": state.weight,
+                    "queue_depth": {priority: len(queue) for priority, queue in state.queues.items()},
+                    "oldest_wait_seconds": {
+                        priority: round(now - queue[0].enqueued_at, 3) if queue else 0.0
+                        for priority, queue in state.queues.items()
+                    },
+                    "wait_seconds": {priority: _summarize_waits(waits) for priority, waits in state.waits.items()},
+                    "running": state.running,
+                    "completed": state.completed,
+                    "rejected": state.rejected,
+                    "requests_last_minute": len(state.request_times),
+                    "requests_per_minute_quota": state.requests_per_minute,
+                    "tokens_last_minute": state.tokens_in_window,
+                    "tokens_per_minute_quota": state.tokens_per_minute,
+                }
+            return metrics
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -12,6 +13,7 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 INPUT_DIR = os.getenv("INPUT_DIR", os.path.join(BASE_DIR, "input"))
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", os.path.join(BASE_DIR, "output"))
 LOG_DIR = os.path.join(BASE_DIR, "logs")
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(BASE_DIR, "export"))
 
 # Ensure required directories exist
 os.makedirs(INPUT_DIR, exist_ok=True)
@@ -23,6 +25,30 @@ SYSTEM_PROMPT = os.getenv("SYSTEM_PROMPT", "Your default system prompt.")
 USER_PROMPT = os.getenv("USER_PROMPT", "Your default user prompt.")
 JSON_TEMPLATE = os.getenv("JSON_TEMPLATE", "{}")  # Default empty JSON template
 
+# DOCX image extraction: images smaller than this (in pixels, either side) are
+# treated as icons/bullets and left out of the combined image sent to GPT-4o
+DOCX_MIN_IMAGE_SIDE = int(os.getenv("DOCX_MIN_IMAGE_SIDE", 100))
+
+# Tenant scheduling: tenants are identified by the X-API-Key header.
+# TENANT_API_KEYS maps API keys to tenant names; unknown keys share the "default" tenant.
+TENANT_API_KEYS = json.loads(os.getenv("TENANT_API_KEYS", "{}"))
+# Relative share of the workers each tenant gets while others are waiting (must be > 0), e.g. {"sales": 2}
+TENANT_WEIGHTS = json.loads(os.getenv("TENANT_WEIGHTS", "{}"))
+# Per-minute quotas (0 = unlimited); TENANT_QUOTAS overrides them per tenant,
+# e.g. {"sales": {"requests_per_minute": 60, "tokens_per_minute": 200000}}
+TENANT_REQUESTS_PER_MINUTE = int(os.getenv("TENANT_REQUESTS_PER_MINUTE", 0))
+TENANT_TOKENS_PER_MINUTE = int(os.getenv("TENANT_TOKENS_PER_MINUTE", 0))
+TENANT_QUOTAS = json.loads(os.getenv("TENANT_QUOTAS", "{}"))
+# Every queued /process_file request holds a web server thread while it waits, so keep
+# the per-tenant depth well below the server's thread count (e.g. gunicorn --threads),
+# otherwise one tenant's backlog can take all threads before the scheduler sees other tenants.
+TENANT_MAX_QUEUE_DEPTH = int(os.getenv("TENANT_MAX_QUEUE_DEPTH", 20))
+# Workers shared by all requests, plus workers reserved for interactive requests only
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 4))
+SCHEDULER_INTERACTIVE_WORKERS = int(os.getenv("SCHEDULER_INTERACTIVE_WORKERS", 1))
+# Seconds a request waits for its result (or, when streaming, for its job to start) before a 503
+SCHEDULER_REQUEST_TIMEOUT = float(os.getenv("SCHEDULER_REQUEST_TIMEOUT", 300))
+
 # Flask Configuration
 FLASK_HOST = os.getenv("FLASK_HOST", "127.0.0.1")
 FLASK_PORT = int(os.getenv("FLASK_PORT", 5000))
@@ -0,0 +1,19 @@
+import argparse
+
+from config.settings import OUTPUT_DIR, EXPORT_DIR
+from config.logging_config import logger
+from utils.export_utils import export_results, compact_export
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export extracted resume info to columnar Arrow files for analytics.")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Directory with *_extracted_info.json files.")
+    parser.add_argument("--export-dir", default=EXPORT_DIR, help="Directory for the exported tables.")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the existing export and re-export everything.")
+    parser.add_argument("--compact", action="store_true", help="Merge the parts of each table into one file.")
+    args = parser.parse_args()
+
+    exported = export_results(args.output_dir, args.export_dir, rebuild=args.rebuild)
+    logger.info(f"Exported {exported} new output files.")
+
+    if args.compact:
+        compact_export(args.export_dir)
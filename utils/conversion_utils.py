@@ -2,12 +2,22 @@ import os
 import time
 import subprocess
 import logging
+import hashlib
+import posixpath
+import xml.etree.ElementTree as ET
 from PIL import Image
 from io import BytesIO
 from zipfile import ZipFile
-from config.settings import OUTPUT_DIR
+from config.settings import OUTPUT_DIR, DOCX_MIN_IMAGE_SIDE
 import platform
 
+# OOXML namespaces used when walking word/document.xml
+W_DRAWING = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}drawing"
+A_BLIP = "{http://schemas.openxmlformats.org/drawingml/2006/main}blip"
+V_IMAGEDATA = "{urn:schemas-microsoft-com:vml}imagedata"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
 if platform.system() == "Windows":
     try:
         from win32com.client import Dispatch
@@ -50,6 +60,85 @@ def convert_doc_to_docx(doc_path):
         else:
             print(f"Unsupported OS: {os.name}")
 
+def _docx_image_targets(docx_zip):
+        """ Map image relationship ids of word/document.xml to their zip entry names. """
+        rels = ET.fromstring(docx_zip.read("word/_rels/document.xml.rels"))
+        targets = {}
+        for rel in rels.iter(f"{{{REL_NS}}}Relationship"):
+            if not rel.get("Type", "").endswith("/image") or rel.get("TargetMode") == "External":
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                targets[rel.get("Id")] = target.lstrip("/")
+            else:
+                targets[rel.get("Id")] = posixpath.normpath(posixpath.join("word", target))
+        return targets
+
+
+def _docx_image_ids_in_order(docx_zip):
+        """ Yield image relationship ids as they appear in the document body, skipping images marked decorative. """
+        root = ET.fromstring(docx_zip.read("word/document.xml"))
+        for element in root.iter():
+            if element.tag == W_DRAWING:
+                if any(child.tag.endswith("}decorative") and child.get("val") in ("1", "true")
+                       for child in element.iter()):
+                    continue
+                for blip in element.iter(A_BLIP):
+                    yield blip.get(f"{{{R_NS}}}embed")
+            elif element.tag == V_IMAGEDATA:
+                yield element.get(f"{{{R_NS}}}id")
+
+
+def extract_images_from_docx(docx_path, min_side=DOCX_MIN_IMAGE_SIDE):
+        """
+        Return the images rendered in the body of a DOCX, in reading order.
+
+        Only word/document.xml is walked, so logos and signatures living in headers and
+        footers are not picked up. Images marked decorative, smaller than min_side pixels
+        on either side, or identical to an image already kept are skipped. Sizes are read
+        from the image header, and only the images that are kept get decoded.
+        """
+        images = []
+        seen_hashes = set()
+
+        with ZipFile(docx_path, 'r') as docx_zip:
+            try:
+                targets = _docx_image_targets(docx_zip)
+                image_files = [targets[rel_id] for rel_id in _docx_image_ids_in_order(docx_zip) if rel_id in targets]
+            except (KeyError, ET.ParseError) as e:
+                logging.warning(f"Could not resolve image order for {docx_path}, falling back to word/media: {e}")
+                image_files = sorted(f for f in docx_zip.namelist() if f.startswith('word/media/'))
+
+            for image_file in image_files:
+                try:
+                    image_data = docx_zip.read(image_file)
+                except KeyError:
+                    logging.warning(f"Image {image_file} referenced but missing in {docx_path}")
+                    continue
+
+                digest = hashlib.sha1(image_data).hexdigest()
+                if digest in seen_hashes:
+                    continue
+                seen_hashes.add(digest)
+
+                try:
+                    # Image.open only parses the header; pixel data is not decoded yet
+                    image = Image.open(BytesIO(image_data))
+                    width, height = image.size
+
+                    if min(width, height) < min_side:
+                        logging.debug(f"Skipping small image {image_file} ({width}x{height}) in {docx_path}")
+                        continue
+
+                    # Decoding can still fail after a good header, e.g. EMF/WMF off Windows
+                    images.append(image.convert("RGB"))
+                except Exception as e:
+                    logging.warning(f"Skipping unreadable image {image_file} in {docx_path}: {e}")
+                    continue
+
+        return images
+
+
 def extract_and_combine_images_from_docx(docx_path):
         # Extract the base name of the DOCX (without extension)
         start_time = time.time()
@@ -62,16 +151,8 @@ def extract_and_combine_images_from_docx(docx_path):
             logging.info(f"Combined image already exists for {docx_path}: {output_path}")
             return output_path  # Return the path of the existing combined image
 
-        # Open the DOCX file as a zip archive
-        with ZipFile(docx_path, 'r') as docx_zip:
-            image_files = [f for f in docx_zip.namelist() if f.startswith('word/media/')]
-            
-            # Extract all images
-            all_images = []
-            for image_file in image_files:
-                image_data = docx_zip.read(image_file)
-                image = Image.open(BytesIO(image_data))
-                all_images.append(image)
+        # Only body images in reading order, without icons and duplicates
+        all_images = extract_images_from_docx(docx_path)
 
         # Combine all images into one
         if all_images:
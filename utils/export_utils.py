@@ -0,0 +1,312 @@
+import os
+import glob
+import json
+import time
+import logging
+import pyarrow as pa
+
+from utils.file_utils import parse_json_output
+
+OUTPUT_SUFFIX = "_extracted_info.json"
+MANIFEST_FILE = "_manifest.json"
+
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+# One normalized table per repeated section of JSON_TEMPLATE, joined on "source"
+SCHEMAS = {
+    "candidates": pa.schema([
+        ("source", pa.string()),
+        ("city", DICT_STRING),
+        ("first_name", pa.string()),
+        ("middle_name", pa.string()),
+        ("last_name", pa.string()),
+        ("full_name", pa.string()),
+        ("title_name", pa.string()),
+        ("date_of_birth", pa.string()),
+        ("nationality", DICT_STRING),
+        ("mobile", pa.list_(pa.string())),
+        ("email", pa.list_(pa.string())),
+        ("current_employer", DICT_STRING),
+        ("current_salary", pa.string()),
+        ("expected_salary", pa.string()),
+        ("total_experience_months", pa.float64()),
+        ("total_experience_years", pa.float64()),
+        ("total_experience_range", DICT_STRING),
+    ]),
+    "academics": pa.schema([
+        ("source", pa.string()),
+        ("degree", DICT_STRING),
+        ("branch", DICT_STRING),
+        ("start_date", pa.string()),
+        ("end_date", pa.string()),
+        ("institute", DICT_STRING),
+        ("score", pa.string()),
+    ]),
+    "work_experience": pa.schema([
+        ("source", pa.string()),
+        ("organization", DICT_STRING),
+        ("designation", DICT_STRING),
+        ("start_date", pa.string()),
+        ("end_date", pa.string()),
+    ]),
+    "skills": pa.schema([
+        ("source", pa.string()),
+        ("skill", DICT_STRING),
+    ]),
+}
+
+
+def _text(value):
+    """Normalize a scalar from the model output to a stripped string or None."""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _number(value):
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _text_list(value):
+    if not isinstance(value, list):
+        value = [value]
+    return [text for text in map(_text, value) if text]
+
+
+def _mapping(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _records(value):
+    if isinstance(value, dict):
+        value = [value]
+    return [record for record in value if isinstance(record, dict)] if isinstance(value, list) else []
+
+
+def flatten_extracted_info(source, info):
+    """
+    Flatten one extracted_info document into rows for each table in SCHEMAS.
+
+    :param source: Name of the output file the document was read from.
+    :param info: Parsed JSON following JSON_TEMPLATE.
+    :return: Dict of table name -> list of row dicts.
+    """
+    personal = _mapping(info.get("PersonalDetails"))
+    name = _mapping(personal.get("Name"))
+    worked = _mapping(info.get("WorkedPeriod"))
+
+    rows = {
+        "candidates": [{
+            "source": source,
+            "city": _text(info.get("City")),
+            "first_name": _text(name.get("FirstName")),
+            "middle_name": _text(name.get("MiddleName")),
+            "last_name": _text(name.get("LastName")),
+            "full_name": _text(name.get("FullName")),
+            "title_name": _text(name.get("TitleName")),
+            "date_of_birth": _text(personal.get("DateOfBirth")),
+            "nationality": _text(personal.get("Nationality")),
+            "mobile": _text_list(personal.get("Mobile") or []),
+            "email": _text_list(personal.get("Email") or []),
+            "current_employer": _text(info.get("CurrentEmployer")),
+            "current_salary": _text(info.get("CurrentSalary")),
+            "expected_salary": _text(info.get("ExpectedSalary")),
+            "total_experience_months": _number(worked.get("TotalExperienceInMonths")),
+            "total_experience_years": _number(worked.get("TotalExperienceInYear")),
+            "total_experience_range": _text(worked.get("TotalExperienceRange")),
+        }],
+        "academics": [{
+            "source": source,
+            "degree": _text(academic.get("Degree")),
+            "branch": _text(academic.get("Branch")),
+            "start_date": _text(academic.get("StartDate")),
+            "end_date": _text(academic.get("EndDate")),
+            "institute": _text(academic.get("Institute")),
+            "score": _text(academic.get("Score")),
+        } for academic in _records(info.get("Academics"))],
+        "work_experience": [{
+            "source": source,
+            "organization": _text(job.get("Organization")),
+            "designation": _text(job.get("Designation")),
+            "start_date": _text(job.get("StartDate")),
+            "end_date": _text(job.get("EndDate")),
+        } for job in _records(info.get("WorkExperience"))],
+        "skills": [{"source": source, "skill": skill}
+                   for skill in dict.fromkeys(_text_list(info.get("Skills") or []))],
+    }
+    return rows
+
+
+def _load_manifest(export_dir):
+    """
+    Load the export manifest. Its "parts" list is the commit point of every write: part
+    files on disk that are not listed (left behind by an interrupted run) are ignored.
+    """
+    manifest_path = os.path.join(export_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {"sources": [], "next_part": 0, "parts": []}
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if "parts" not in manifest:
+        # Manifests written before parts were tracked: every part on disk is live
+        manifest["parts"] = [os.path.basename(path) for path in _part_files(export_dir, "candidates")]
+    return manifest
+
+
+def _save_manifest(export_dir, manifest):
+    manifest_path = os.path.join(export_dir, MANIFEST_FILE)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def _part_files(export_dir, table):
+    return sorted(glob.glob(os.path.join(export_dir, table, "part-*.arrow")))
+
+
+def _part_paths(export_dir, table, manifest):
+    return [os.path.join(export_dir, table, part_name) for part_name in manifest["parts"]]
+
+
+def _remove_stale_parts(export_dir, manifest):
+    """Delete part files not listed in the manifest."""
+    live = set(manifest["parts"])
+    for table in SCHEMAS:
+        for path in _part_files(export_dir, table):
+            if os.path.basename(path) not in live:
+                os.remove(path)
+
+
+def _write_table(path, table):
+    """Write an Arrow IPC file atomically so readers never map a partial file."""
+    with pa.OSFile(path + ".tmp", "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(path + ".tmp", path)
+
+
+def export_results(output_dir, export_dir, rebuild=False):
+    """
+    Append extracted_info files not exported yet to the columnar export.
+
+    Each run writes one new Arrow IPC part per table; the manifest tracks which
+    output files were already exported so subsequent runs only pick up new ones.
+
+    :param output_dir: Directory containing *_extracted_info.json files.
+    :param export_dir: Directory holding the columnar tables.
+    :param rebuild: Drop the existing export and re-export every output file.
+    :return: Number of output files exported in this run.
+    """
+    start_time = time.time()
+
+    if rebuild:
+        for table in SCHEMAS:
+            for path in _part_files(export_dir, table):
+                os.remove(path)
+        manifest_path = os.path.join(export_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+    os.makedirs(export_dir, exist_ok=True)
+    manifest = _load_manifest(export_dir)
+    _remove_stale_parts(export_dir, manifest)
+    exported = set(manifest["sources"])
+
+    rows = {table: [] for table in SCHEMAS}
+    new_sources = []
+    for path in sorted(glob.glob(os.path.join(output_dir, f"*{OUTPUT_SUFFIX}"))):
+        source = os.path.basename(path)
+        if source in exported:
+            continue
+
+        try:
+            with open(path, "r", encoding="utf-8") as json_file:
+                info = parse_json_output(json_file.read())
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Skipping unreadable output file {path}: {e}")
+            continue
+        if not isinstance(info, dict):
+            logging.warning(f"Skipping output file {path}: expected a JSON object")
+            continue
+
+        try:
+            flattened = flatten_extracted_info(source, info)
+        except Exception as e:
+            logging.warning(f"Skipping output file {path}: could not flatten: {e}")
+            continue
+
+        for table, table_rows in flattened.items():
+            rows[table].extend(table_rows)
+        new_sources.append(source)
+
+    if not new_sources:
+        logging.info(f"No new output files to export from {output_dir}")
+        return 0
+
+    part_name = f"part-{manifest['next_part']:05d}.arrow"
+    for table, schema in SCHEMAS.items():
+        os.makedirs(os.path.join(export_dir, table), exist_ok=True)
+        columns = {name: [row[name] for row in rows[table]] for name in schema.names}
+        _write_table(os.path.join(export_dir, table, part_name), pa.Table.from_pydict(columns, schema=schema))
+
+    manifest["sources"].extend(new_sources)
+    manifest["parts"].append(part_name)
+    manifest["next_part"] += 1
+    _save_manifest(export_dir, manifest)
+
+    logging.info(f"Exported {len(new_sources)} output files to {export_dir} in {time.time() - start_time:.2f} seconds.")
+    return len(new_sources)
+
+
+def compact_export(export_dir):
+    """
+    Merge the parts of every table into a single part with unified dictionaries.
+
+    The merged parts only replace the old ones once the manifest is saved, so an
+    interrupted compaction never makes readers see rows twice.
+    """
+    start_time = time.time()
+    manifest = _load_manifest(export_dir)
+    if len(manifest["parts"]) < 2:
+        logging.info(f"Nothing to compact in {export_dir}")
+        return
+
+    part_name = f"part-{manifest['next_part']:05d}.arrow"
+    for table in SCHEMAS:
+        merged = read_export(export_dir, table).unify_dictionaries().combine_chunks()
+        _write_table(os.path.join(export_dir, table, part_name), merged)
+
+    manifest["parts"] = [part_name]
+    manifest["next_part"] += 1
+    _save_manifest(export_dir, manifest)
+    _remove_stale_parts(export_dir, manifest)
+    logging.info(f"Compacted export in {export_dir} in {time.time() - start_time:.2f} seconds.")
+
+
+def read_export(export_dir, table, columns=None):
+    """
+    Memory-map all parts of an exported table and return them as one pyarrow Table.
+
+    Data is not copied into memory; pages are read on access, so scanning a few
+    columns of a large export stays cheap.
+
+    :param export_dir: Directory holding the columnar tables.
+    :param table: One of "candidates", "academics", "work_experience", "skills".
+    :param columns: Optional list of column names to select.
+    """
+    if table not in SCHEMAS:
+        raise ValueError(f"Unknown table: {table}")
+
+    tables = []
+    for path in _part_paths(export_dir, table, _load_manifest(export_dir)):
+        part = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        tables.append(part.select(columns) if columns else part)
+
+    if not tables:
+        schema = SCHEMAS[table]
+        return schema.empty_table().select(columns) if columns else schema.empty_table()
+    return pa.concat_tables(tables)
@@ -12,6 +12,14 @@ def read_file(file_path):
     with open(file_path, 'r') as file:
         return file.read()
 
+def parse_json_output(extracted_text):
+    """Parse a model response into JSON, tolerating surrounding markdown code fences."""
+    text = extracted_text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return json.loads(text)
+
 def write_output_file(output_directory, filename, extracted_text, write_all=False, write_new=False):
     """Writes extracted text to a JSON file, handling --write-all and --write-new flags."""
     start_time = time.time()